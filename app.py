@@ -1,12 +1,18 @@
 from flask import Flask, render_template, request, jsonify, send_file, session
+from flask.json.provider import JSONProvider
+import orjson
 import geopandas
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import shapely
 from shapely.geometry import shape
-from shapely.ops import union_all # union_all is preferred over unary_union for a list of geometries
 import folium
 from folium.plugins import Draw
 import io
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import gdown
 import logging
 
@@ -16,8 +22,34 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 app = Flask(__name__)
 app.secret_key = os.urandom(24) # Required for session management
 
+class ORJSONProvider(JSONProvider):
+    """orjson-backed JSON provider: several times faster than stdlib json for
+    the large parcel lists returned by /process_boundary, and serializes numpy
+    scalars directly without Python-level casts."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app.json = ORJSONProvider(app)
+
 # --- Global variable for the final merged and processed data ---
 merged_gdf = None
+# STRtree over merged_gdf's geometries, built once after load. Query results
+# are positional indices into merged_gdf, so the two must stay in sync.
+parcel_tree = None
+# Geometry-free companion frame (SSL, FULLADDRESS, ASSESSED_VALUE_TAX) built
+# alongside the tree: per-request candidate takes come from here, so request
+# handlers never slice columns out of the full merged_gdf.
+parcel_attributes = None
+# Map center for the index view, computed once at load time. Defaults to
+# downtown DC until data is available.
+map_center = [38.9072, -77.0369]
+# Server-side store for boundary-query results, keyed by a short UUID kept in
+# the session cookie. Serializing full parcel lists into the signed cookie
+# blew past the 4KB limit and HMAC'd tens of KB on every response.
+result_cache = {}
 logging.info("Script started. Flask app initializing...")
 
 # --- Data Loading and Preprocessing ---
@@ -33,6 +65,25 @@ DATA_FILES = {
     # Removed "tax_parcels" as it's not used
 }
 
+# Internal working CRS: Maryland State Plane (meters). Planar coordinates give
+# GEOS tighter bounding-box arithmetic than lat/lon degrees and keep any future
+# distance/area math correct. GeoJSON stays WGS84 at the request boundaries.
+INTERNAL_CRS = "EPSG:26985"
+
+# GeoParquet snapshot of the fully merged/processed data. Loading it back is a
+# columnar binary read, so restarts skip the whole download/parse/merge pipeline.
+MERGED_CACHE_PATH = "merged_cache.parquet"
+
+def merged_cache_is_fresh():
+    """Returns True if the GeoParquet cache exists and is newer than the source CSVs."""
+    if not os.path.exists(MERGED_CACHE_PATH):
+        return False
+    cache_mtime = os.path.getmtime(MERGED_CACHE_PATH)
+    for file_info in DATA_FILES.values():
+        if os.path.exists(file_info["path"]) and os.path.getmtime(file_info["path"]) > cache_mtime:
+            return False
+    return True
+
 def download_if_needed(file_info):
     """Downloads a file from Google Drive if it doesn't exist locally."""
     if not os.path.exists(file_info["path"]):
@@ -48,70 +99,125 @@ def download_if_needed(file_info):
     else:
         logging.info(f"{file_info['path']} already exists locally.")
 
-def load_all_data():
-    global merged_gdf # Declare that we are modifying the global variable
-
-    # Download data files at startup if they don't exist
-    for key, file_info in DATA_FILES.items():
-        # Removed check for placeholder ID for tax_parcels as it's no longer in DATA_FILES
-        try:
-            download_if_needed(file_info)
-        except Exception as e:
-            logging.critical(f"Failed to download essential data file {file_info['path']}. Application might not work correctly. Error: {e}")
+def compute_map_center():
+    """Computes the map center once from total_bounds — the former per-request
+    union_all over every geometry was an expensive way to get the same point."""
+    global map_center
+    if merged_gdf is not None and not merged_gdf.empty and 'geometry' in merged_gdf.columns:
+        minx, miny, maxx, maxy = merged_gdf.total_bounds
+        # Bounds are in the planar internal CRS (meters); Folium needs lat/lon,
+        # so transform just the midpoint back to WGS84.
+        center = geopandas.GeoSeries(
+            [shapely.Point((minx + maxx) / 2, (miny + maxy) / 2)],
+            crs=merged_gdf.crs).to_crs("EPSG:4326").iloc[0]
+        map_center = [center.y, center.x]
+        logging.info(f"Map center computed from data bounds: {map_center}")
+    else:
+        logging.warning("No data available to compute map center, keeping default.")
+
+def build_spatial_index():
+    """(Re)builds the module-level STRtree over merged_gdf's geometries and
+    the thin attribute frame its query results index into."""
+    global parcel_tree, parcel_attributes
+    if merged_gdf is not None and not merged_gdf.empty:
+        parcel_tree = shapely.STRtree(merged_gdf.geometry.values)
+        # Copy the three response columns out once here, so each request's
+        # .iloc take is O(candidates) instead of an O(N) column slice
+        parcel_attributes = pd.DataFrame(
+            merged_gdf[['SSL', 'FULLADDRESS', 'ASSESSED_VALUE_TAX']])
+        logging.info(f"Spatial index built over {len(merged_gdf)} geometries.")
+    else:
+        parcel_tree = None
+        parcel_attributes = None
+        logging.warning("No data available to build the spatial index.")
 
+def load_parcels():
+    """Downloads (if needed) and loads/processes the parcel data file."""
     # --- Load Parcel Data (ITSPE View) ---
-    parcels_data_path = DATA_FILES["parcels"]["path"]
+    file_info = DATA_FILES["parcels"]
+    try:
+        download_if_needed(file_info)
+    except Exception as e:
+        logging.critical(f"Failed to download essential data file {file_info['path']}. Application might not work correctly. Error: {e}")
+
+    parcels_data_path = file_info["path"]
     current_parcels_gdf = None
     if os.path.exists(parcels_data_path):
         try:
             logging.info(f"Loading parcel data from {parcels_data_path}...")
-            current_parcels_gdf = geopandas.read_file(parcels_data_path, dtype={'SSL': str}, low_memory=False)
+            # pyogrio reads through GDAL's Arrow stream — columnar and much faster
+            # than the per-feature Fiona path; restricting columns keeps unused
+            # attributes from ever materializing
+            current_parcels_gdf = geopandas.read_file(
+                parcels_data_path, engine="pyogrio", use_arrow=True,
+                columns=['SSL', 'NEWTOTAL', 'ASSESSMENT', 'geometry'])
+            if 'SSL' in current_parcels_gdf.columns:
+                current_parcels_gdf['SSL'] = current_parcels_gdf['SSL'].astype('string')
             logging.info(f"Parcel data loaded. Shape: {current_parcels_gdf.shape}, Initial CRS: {current_parcels_gdf.crs}")
             
             # Validate geometries and set CRS
             current_parcels_gdf = current_parcels_gdf[current_parcels_gdf.is_valid & ~current_parcels_gdf.is_empty]
             if current_parcels_gdf.crs is None:
-                logging.warning("Parcels GDF has no CRS, setting to EPSG:4326")
+                logging.warning("Parcels GDF has no CRS, assuming EPSG:4326")
                 current_parcels_gdf = current_parcels_gdf.set_crs("EPSG:4326", allow_override=True)
-            elif current_parcels_gdf.crs.to_string().upper() != "EPSG:4326":
-                logging.info(f"Reprojecting parcels_gdf from {current_parcels_gdf.crs} to EPSG:4326")
-                current_parcels_gdf = current_parcels_gdf.to_crs("EPSG:4326")
+            if current_parcels_gdf.crs.to_string().upper() != INTERNAL_CRS:
+                logging.info(f"Reprojecting parcels_gdf from {current_parcels_gdf.crs} to {INTERNAL_CRS}")
+                current_parcels_gdf = current_parcels_gdf.to_crs(INTERNAL_CRS)
 
             # Derive ASSESSED_VALUE_TAX from the parcels data itself
             if 'NEWTOTAL' in current_parcels_gdf.columns:
                 logging.info("Using 'NEWTOTAL' column from parcels data for assessed value.")
-                current_parcels_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(current_parcels_gdf['NEWTOTAL'], errors='coerce').fillna(0)
+                # downcast='float' lands on float32, plenty of range/precision
+                # for dollar assessments and half the memory bandwidth when
+                # process_boundary sums the column
+                current_parcels_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(current_parcels_gdf['NEWTOTAL'], errors='coerce', downcast='float').fillna(0)
             elif 'ASSESSMENT' in current_parcels_gdf.columns: # Fallback to 'ASSESSMENT'
                 logging.info("Using 'ASSESSMENT' column from parcels data for assessed value.")
-                current_parcels_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(current_parcels_gdf['ASSESSMENT'], errors='coerce').fillna(0)
+                current_parcels_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(current_parcels_gdf['ASSESSMENT'], errors='coerce', downcast='float').fillna(0)
             else:
                 logging.warning("'NEWTOTAL' or 'ASSESSMENT' column not found in parcels data. 'ASSESSED_VALUE_TAX' will be initialized to 0.")
                 current_parcels_gdf['ASSESSED_VALUE_TAX'] = 0 # Ensure the column exists
 
+            # The raw assessment columns only feed the derivation above; drop
+            # them so they don't ride along in merged_gdf, every request
+            # slice, and the parquet cache
+            current_parcels_gdf = current_parcels_gdf[['SSL', 'ASSESSED_VALUE_TAX', 'geometry']]
+
             logging.info(f"Parcel data processed. Shape: {current_parcels_gdf.shape}, CRS: {current_parcels_gdf.crs}. Columns: {current_parcels_gdf.columns.tolist()}")
 
         except Exception as e:
             logging.error(f"Error loading or processing parcel data from {parcels_data_path}: {e}")
-            current_parcels_gdf = geopandas.GeoDataFrame(columns=['SSL', 'geometry', 'ASSESSED_VALUE_TAX'], crs="EPSG:4326")
+            current_parcels_gdf = geopandas.GeoDataFrame(columns=['SSL', 'geometry', 'ASSESSED_VALUE_TAX'], crs=INTERNAL_CRS)
             current_parcels_gdf['ASSESSED_VALUE_TAX'] = 0 # Ensure column exists in empty GDF
     else:
         logging.error(f"Parcel data file {parcels_data_path} not found. Skipping loading.")
-        current_parcels_gdf = geopandas.GeoDataFrame(columns=['SSL', 'geometry', 'ASSESSED_VALUE_TAX'], crs="EPSG:4326")
+        current_parcels_gdf = geopandas.GeoDataFrame(columns=['SSL', 'geometry', 'ASSESSED_VALUE_TAX'], crs=INTERNAL_CRS)
         current_parcels_gdf['ASSESSED_VALUE_TAX'] = 0 # Ensure column exists
 
+    return current_parcels_gdf
+
+def load_addresses():
+    """Downloads (if needed) and loads/processes the address points file."""
     # --- Load Address Data ---
-    address_data_path = DATA_FILES["address"]["path"]
+    file_info = DATA_FILES["address"]
+    try:
+        download_if_needed(file_info)
+    except Exception as e:
+        logging.critical(f"Failed to download essential data file {file_info['path']}. Application might not work correctly. Error: {e}")
+
+    address_data_path = file_info["path"]
     address_df = None
     if os.path.exists(address_data_path):
         try:
             logging.info(f"Loading address data from {address_data_path}...")
-            address_df = pd.read_csv(address_data_path, dtype={'SSL': str}, low_memory=False)
-            # Select only necessary columns and drop duplicates by SSL, keeping the first occurrence
-            if 'SSL' in address_df.columns and 'FULLADDRESS' in address_df.columns:
-                 address_df = address_df[['SSL', 'FULLADDRESS']].drop_duplicates(subset=['SSL'], keep='first')
-            else:
-                logging.warning("Address data missing SSL or FULLADDRESS columns.")
-                address_df = pd.DataFrame(columns=['SSL', 'FULLADDRESS'])
+            # The pyarrow engine parses multithreaded and, with usecols, never
+            # materializes the unused address columns; Arrow-backed strings also
+            # halve memory vs object dtype. A missing SSL/FULLADDRESS column
+            # raises here and is handled by the except below.
+            address_df = pd.read_csv(address_data_path, engine="pyarrow",
+                                     usecols=['SSL', 'FULLADDRESS'], dtype_backend="pyarrow")
+            # Drop duplicates by SSL, keeping the first occurrence
+            address_df = address_df.drop_duplicates(subset=['SSL'], keep='first')
             logging.info(f"Address data loaded and processed. Shape: {address_df.shape}")
         except Exception as e:
             logging.error(f"Error loading address data from {address_data_path}: {e}")
@@ -120,6 +226,37 @@ def load_all_data():
         logging.error(f"Address data file {address_data_path} not found. Skipping loading.")
         address_df = pd.DataFrame(columns=['SSL', 'FULLADDRESS'])
 
+    return address_df
+
+def load_all_data():
+    global merged_gdf # Declare that we are modifying the global variable
+
+    # Fast path: reuse the cached merged GeoDataFrame if it's newer than the sources
+    if merged_cache_is_fresh():
+        try:
+            logging.info(f"Loading merged data from cache {MERGED_CACHE_PATH}...")
+            merged_gdf = geopandas.read_parquet(MERGED_CACHE_PATH)
+            # A cache written before the switch to the planar internal CRS
+            # would be in EPSG:4326; rebuild rather than serve mixed CRSs
+            if merged_gdf.crs is None or merged_gdf.crs.to_string().upper() != INTERNAL_CRS:
+                raise ValueError(f"cached CRS {merged_gdf.crs} != {INTERNAL_CRS}")
+            logging.info(f"Merged data loaded from cache. Shape: {merged_gdf.shape}, CRS: {merged_gdf.crs}")
+            build_spatial_index()
+            compute_map_center()
+            return
+        except Exception as e:
+            logging.error(f"Error loading cached merged data from {MERGED_CACHE_PATH}: {e}. Rebuilding from source files.")
+
+    # The parcel and address pipelines (download + parse + per-file
+    # processing) are independent, so they run on a small thread pool —
+    # gdown, pyogrio and pyarrow all release the GIL during I/O and parsing,
+    # so cold start drops to roughly the slower of the two paths.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parcels_future = executor.submit(load_parcels)
+        address_future = executor.submit(load_addresses)
+        current_parcels_gdf = parcels_future.result()
+        address_df = address_future.result()
+
     # --- Load Tax Data ---
     # This section is now removed as we are not using a separate tax file.
     # tax_data_path = DATA_FILES["tax_parcels"]["path"] 
@@ -154,7 +291,16 @@ def load_all_data():
 
     # Merge with address data
     if not address_df.empty and 'SSL' in address_df.columns:
-        temp_merged_gdf = temp_merged_gdf.merge(address_df, on='SSL', how='left')
+        # Encode SSL on both sides against a shared category set first, so the
+        # join key is a packed int code instead of per-string hashing, and the
+        # key columns shrink to a fraction of their object-dtype size
+        ssl_categories = pd.Categorical(pd.concat([temp_merged_gdf['SSL'].astype('string'),
+                                                   address_df['SSL'].astype('string')]).unique())
+        temp_merged_gdf['SSL'] = pd.Categorical(temp_merged_gdf['SSL'], categories=ssl_categories.categories)
+        address_df['SSL'] = pd.Categorical(address_df['SSL'], categories=ssl_categories.categories)
+        # address_df is already deduplicated on SSL, so an index-aligned join
+        # goes through the faster reindex path instead of a generic hash-join
+        temp_merged_gdf = temp_merged_gdf.join(address_df.set_index('SSL'), on='SSL', how='left')
         logging.info(f"Shape after merging with address_df: {temp_merged_gdf.shape}")
     else:
         logging.warning("Address data is empty or missing SSL column. Skipping merge with address data.")
@@ -175,7 +321,7 @@ def load_all_data():
     # This is important as it might not have been set if NEWTOTAL/ASSESSMENT wasn't in parcels_gdf
     # or if it was set from parcels_gdf but had issues.
     if 'ASSESSED_VALUE_TAX' in temp_merged_gdf.columns:
-        temp_merged_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(temp_merged_gdf['ASSESSED_VALUE_TAX'], errors='coerce').fillna(0)
+        temp_merged_gdf['ASSESSED_VALUE_TAX'] = pd.to_numeric(temp_merged_gdf['ASSESSED_VALUE_TAX'], errors='coerce', downcast='float').fillna(0)
     else:
         logging.warning("'ASSESSED_VALUE_TAX' column was not found or created from parcels data. Initializing to 0.")
         temp_merged_gdf['ASSESSED_VALUE_TAX'] = 0
@@ -187,14 +333,23 @@ def load_all_data():
         logging.error("CRITICAL: Merged GeoDataFrame is empty. The application will not have data to display or process.")
     else:
         logging.info(f"Final merged_gdf. Shape: {merged_gdf.shape}, CRS: {merged_gdf.crs}. Columns: {merged_gdf.columns.tolist()}")
-        # Ensure geometry is valid and CRS is set one last time
-        merged_gdf = merged_gdf[merged_gdf.is_valid & ~merged_gdf.is_empty]
-        if merged_gdf.crs is None:
-            merged_gdf = merged_gdf.set_crs("EPSG:4326", allow_override=True)
-        elif merged_gdf.crs.to_string().upper() != "EPSG:4326":
-            merged_gdf = merged_gdf.to_crs("EPSG:4326")
-        logging.info(f"Final merged_gdf after validation. Shape: {merged_gdf.shape}, CRS: {merged_gdf.crs}")
+        # Geometry validity and the internal CRS were already enforced on the
+        # parcel frame in load_parcels, and the attribute-only address join
+        # cannot change either, so there is no second O(N) GEOS validity pass
+        # here. Invariant: after load_all_data returns, merged_gdf contains
+        # only valid, non-empty geometries in INTERNAL_CRS — request handlers
+        # rely on this and must not re-run per-request is_valid scans.
+        merged_gdf = merged_gdf.reset_index(drop=True)
+        assert merged_gdf.crs is not None and merged_gdf.crs.to_string().upper() == INTERNAL_CRS
+        # Persist the processed result so the next startup can skip the pipeline
+        try:
+            merged_gdf.to_parquet(MERGED_CACHE_PATH, compression="zstd")
+            logging.info(f"Cached merged data to {MERGED_CACHE_PATH}.")
+        except Exception as e:
+            logging.warning(f"Could not write merged data cache to {MERGED_CACHE_PATH}: {e}")
 
+    build_spatial_index()
+    compute_map_center()
     logging.info("Data loading and preprocessing complete.")
 
 # Load data at application startup
@@ -206,38 +361,19 @@ else:
     logging.info("Data loaded successfully at startup.")
 
 
-@app.route('/')
-def index():
-    global merged_gdf # Ensure we are using the globally loaded and processed GDF
-    if merged_gdf is None or merged_gdf.empty:
-        logging.error("merged_gdf is not available for the index route.")
-        # Attempt to reload data if it's missing, as a fallback.
-        # This might be redundant if startup loading is robust.
-        logging.info("Attempting to reload data for index route...")
-        load_all_data()
-        if merged_gdf is None or merged_gdf.empty:
-            return "Error: Parcel data could not be loaded or is empty. Please check server logs.", 500
-
-    # Calculate map center
-    # Check if 'geometry' column exists and is not empty before trying to access .union_all()
-    if 'geometry' in merged_gdf.columns and not merged_gdf['geometry'].empty and merged_gdf.geom_type.is_valid.all():
-        try:
-            # Filter out any invalid geometries before union_all
-            valid_geometries = merged_gdf[merged_gdf.is_valid]
-            if not valid_geometries.empty:
-                 # union_all() expects a list/array of geometries
-                map_center_geom = union_all(valid_geometries['geometry'].tolist())
-                map_center = [map_center_geom.centroid.y, map_center_geom.centroid.x]
-            else: # Fallback if no valid geometries
-                logging.warning("No valid geometries in merged_gdf for map centering, using default.")
-                map_center = [38.9072, -77.0369] # Default to DC center
-        except Exception as e:
-            logging.error(f"Error calculating map center from merged_gdf: {e}. Using default.")
-            map_center = [38.9072, -77.0369] # Default to DC center
-    else:
-        logging.warning("merged_gdf is empty, missing 'geometry' column, or contains invalid geometries for map centering. Using default.")
-        map_center = [38.9072, -77.0369] # Default to DC center
-        
+# Rendered Folium map HTML for the index view. The map is identical for every
+# visitor, so it's rendered once (lazily, after data load) and the cached
+# string is served on every subsequent request.
+index_map_html = None
+
+def render_index_map():
+    """Builds the Folium map (Draw plugin + iframe JS) once and caches its HTML."""
+    global index_map_html
+    if index_map_html is not None:
+        return index_map_html
+
+    # Map center was computed once at load time (load_all_data), so the
+    # former per-request union_all over every geometry is gone.
     m = folium.Map(location=map_center, zoom_start=12, tiles="CartoDB positron")
     draw = Draw(
         export=False,
@@ -282,8 +418,19 @@ def index():
     """
     m.get_root().html.add_child(folium.Element(js_to_inject))
 
-    map_html = m._repr_html_()
-    return render_template('index.html', map_html=map_html)
+    index_map_html = m._repr_html_()
+    return index_map_html
+
+@app.route('/')
+def index():
+    # Loading happens exactly once, at startup. Re-running the multi-second
+    # pipeline from the request path was thread-unsafe and could kick off
+    # concurrent CSV re-parses under load, so a missing dataset is now a 503.
+    if merged_gdf is None or merged_gdf.empty:
+        logging.error("merged_gdf is not available for the index route.")
+        return "Service temporarily unavailable: data not loaded.", 503
+
+    return render_template('index.html', map_html=render_index_map())
 
 @app.route('/process_boundary', methods=['POST'])
 def process_boundary():
@@ -298,39 +445,38 @@ def process_boundary():
     try:
         user_geojson_geometry = data['geometry']
         user_polygon = shape(user_geojson_geometry) # shapely.geometry.shape
+        # Self-intersecting doodles would make the GEOS predicate throw;
+        # make_valid repairs them directly (GEOSMakeValid) without the far
+        # more expensive buffer(0) trick
+        if not user_polygon.is_valid:
+            user_polygon = shapely.make_valid(user_polygon)
+        # Drawn GeoJSON is WGS84 by spec; the parcel data and its STRtree live
+        # in the planar internal CRS, so reproject the one drawn polygon (cheap)
+        # instead of ever touching the hundred-thousand parcel geometries.
+        user_polygon = geopandas.GeoSeries([user_polygon], crs="EPSG:4326").to_crs(INTERNAL_CRS).iloc[0]
 
         if merged_gdf is None or merged_gdf.empty or 'geometry' not in merged_gdf.columns:
             logging.error("merged_gdf is empty or missing geometry column before spatial query.")
             return jsonify({"error": "No parcel data available for processing. Check server logs."}), 500
         
-        # Ensure current_merged_gdf is a GeoDataFrame and has a valid CRS
-        current_merged_gdf_for_query = merged_gdf.copy() # Work with a copy for safety
-        if not isinstance(current_merged_gdf_for_query, geopandas.GeoDataFrame):
-            logging.error("Data is not a GeoDataFrame before spatial query.")
-            return jsonify({"error": "Internal server error: Parcel data is not in expected format."}), 500
-
-        if current_merged_gdf_for_query.crs is None:
-            logging.warning("merged_gdf has no CRS in process_boundary, setting to EPSG:4326")
-            current_merged_gdf_for_query = current_merged_gdf_for_query.set_crs("EPSG:4326", allow_override=True)
-        elif current_merged_gdf_for_query.crs.to_string().upper() != "EPSG:4326":
-            logging.warning(f"Reprojecting merged_gdf from {current_merged_gdf_for_query.crs} to EPSG:4326 in process_boundary")
-            current_merged_gdf_for_query = current_merged_gdf_for_query.to_crs("EPSG:4326")
-
-        # Perform spatial query
-        # Ensure user_polygon is implicitly EPSG:4326 (standard for GeoJSON)
-        # Filter out invalid geometries from the query GeoDataFrame
-        valid_query_gdf = current_merged_gdf_for_query[current_merged_gdf_for_query.is_valid]
-        if valid_query_gdf.empty:
-            logging.info("No valid geometries in merged_gdf to perform intersection.")
+        # Perform spatial query (both sides now in INTERNAL_CRS)
+        # Geometries are validated once at load time and the persistent STRtree
+        # is built over exactly those rows, so each request is an O(log N)
+        # candidate lookup plus exact intersects tests on the few candidates.
+        # The predicate runs as shapely 2.x's batched C-level intersects over
+        # the raw geometry array — no per-row Series apply anywhere.
+        if parcel_tree is None:
+            logging.info("No spatial index available to perform intersection.")
             intersecting_parcels = geopandas.GeoDataFrame([])
         else:
-            # Use sindex if available and GDF is large, otherwise direct intersection
-            if hasattr(valid_query_gdf, 'sindex') and valid_query_gdf.sindex is not None:
-                 possible_matches_index = list(valid_query_gdf.sindex.intersection(user_polygon.bounds))
-                 possible_matches = valid_query_gdf.iloc[possible_matches_index]
-                 intersecting_parcels = possible_matches[possible_matches.intersects(user_polygon)]
-            else: # Fallback for smaller GDFs or if sindex is not built/available
-                 intersecting_parcels = valid_query_gdf[valid_query_gdf.intersects(user_polygon)]
+            # Prepare the drawn polygon so GEOS indexes its edges once and
+            # every candidate predicate test reuses that index (shapely 2.x
+            # equivalent of shapely.prepared.prep)
+            shapely.prepare(user_polygon)
+            candidate_idx = parcel_tree.query(user_polygon, predicate='intersects')
+            # Take the candidate rows from the pre-narrowed attribute frame —
+            # it shares positions with the tree and never touches geometry
+            intersecting_parcels = parcel_attributes.iloc[candidate_idx]
 
 
         logging.info(f"Found {len(intersecting_parcels)} intersecting parcels.")
@@ -338,22 +484,37 @@ def process_boundary():
         if intersecting_parcels.empty:
             total_assessed_value = 0
             parcel_details_list = []
+            result_table = None
         else:
-            total_assessed_value = intersecting_parcels['ASSESSED_VALUE_TAX'].fillna(0).sum()
-            # Ensure FULLADDRESS exists, fill with 'N/A' if not
-            if 'FULLADDRESS' not in intersecting_parcels.columns:
-                details_df = intersecting_parcels.copy() # Avoid SettingWithCopyWarning
-                details_df['FULLADDRESS'] = 'N/A'
-                parcel_details_list = details_df[['SSL', 'FULLADDRESS', 'ASSESSED_VALUE_TAX']].fillna({'SSL': 'N/A', 'FULLADDRESS': 'N/A', 'ASSESSED_VALUE_TAX': 0}).to_dict(orient='records')
-            else:
-                parcel_details_list = intersecting_parcels[['SSL', 'FULLADDRESS', 'ASSESSED_VALUE_TAX']].fillna({'SSL': 'N/A', 'FULLADDRESS': 'N/A', 'ASSESSED_VALUE_TAX': 0}).to_dict(orient='records')
-        
-        # Store data in session for CSV download
-        session['parcel_details'] = parcel_details_list
-
+            # ASSESSED_VALUE_TAX was coerced to NaN-free float at load time, so
+            # the sum is a straight NumPy reduction — no per-request fillna
+            total_assessed_value = intersecting_parcels['ASSESSED_VALUE_TAX'].sum()
+            # FULLADDRESS is NA for parcels the address join didn't match
+            thin_details = pd.DataFrame({
+                'SSL': intersecting_parcels['SSL'].astype(str),
+                'FULLADDRESS': intersecting_parcels['FULLADDRESS'].fillna('N/A').astype(str),
+                'ASSESSED_VALUE_TAX': intersecting_parcels['ASSESSED_VALUE_TAX'].to_numpy()
+            })
+            parcel_details_list = thin_details.to_dict(orient='records')
+            # Keep the columnar form for the CSV download — converting the
+            # records list back to a table there would round-trip every cell
+            # through Python objects a second time
+            result_table = pa.Table.from_pandas(thin_details, preserve_index=False)
+
+        # Store data server-side for CSV download; only the key travels in the
+        # cookie. Evict this session's previous result first — otherwise every
+        # redraw orphans a full table and the cache grows without bound.
+        result_cache.pop(session.get('result_key'), None)
+        result_key = uuid.uuid4().hex
+        result_cache[result_key] = result_table
+        session['result_key'] = result_key
+
+        # np.float32 (from the downcast column) is not a float subclass, so
+        # coerce explicitly rather than depend on the JSON provider's numpy
+        # handling
         return jsonify({
             "message": "Boundary processed successfully",
-            "total_value": total_assessed_value,
+            "total_value": float(total_assessed_value),
             "parcel_count": len(intersecting_parcels),
             "parcels": parcel_details_list # Optionally send some details back directly
         })
@@ -364,18 +525,19 @@ def process_boundary():
 
 @app.route('/download_csv')
 def download_csv():
-    # Retrieve data from session
-    parcel_data_for_csv = session.get('parcel_details') 
-    if not parcel_data_for_csv:
+    # Retrieve the Arrow table from the server-side store via the session key
+    table = result_cache.get(session.get('result_key'))
+    if table is None or table.num_rows == 0:
         return "No data for CSV. Draw a boundary first.", 404
 
-    df_to_download = pd.DataFrame(parcel_data_for_csv)
-    csv_buffer = io.StringIO()
-    df_to_download.to_csv(csv_buffer, index=False)
-    csv_buffer.seek(0)
+    # Write the CSV with Arrow straight into one binary buffer — the previous
+    # DataFrame -> StringIO -> encoded BytesIO chain held three full copies
+    # of the CSV in memory and formatted every row in Python
+    buf = pa.BufferOutputStream()
+    pacsv.write_csv(table, buf)
 
     return send_file(
-        io.BytesIO(csv_buffer.getvalue().encode('utf-8')),
+        io.BytesIO(buf.getvalue().to_pybytes()),
         mimetype='text/csv',
         as_attachment=True,
         download_name='parcels_in_boundary.csv'
@@ -34,9 +34,10 @@ When you run this script, it will generate:
 
 import geopandas as gpd
 from shapely.geometry import LineString
-import contextily as ctx
 import folium
-import matplotlib.pyplot as plt
+# contextily and matplotlib are imported lazily inside build_static_map() —
+# both drag in heavy transitive dependencies (tile provider registry, font
+# caches) that the Folium block never needs
 
 # 1. Define conceptual extended street segments using approximate coordinates (lat, lon)
 # We choose representative lines extending through the RFK Stadium site:
@@ -59,42 +60,55 @@ extended_lines = [
 ext_gdf = gpd.GeoDataFrame(geometry=extended_lines, crs="EPSG:4326")
 
 # 2. Prepare a static map with contextily (OSM base) and matplotlib
-# Project geometries to Web Mercator (EPSG:3857) for plotting with OSM tiles
-ext_gdf_merc = ext_gdf.to_crs(epsg=3857)
-# Determine plot extents (add a small margin around the data bounds for context)
-minx, miny, maxx, maxy = ext_gdf_merc.total_bounds
-x_margin = (maxx - minx) * 0.1
-y_margin = (maxy - miny) * 0.1
-# Create plot
-fig, ax = plt.subplots(figsize=(8, 6))
-# Plot the extended lines in red dashed style
-ext_gdf_merc.plot(ax=ax, color='red', linewidth=2, linestyle='--', label='Proposed Extended Streets')
-# Add OpenStreetMap base tiles
-ctx.add_basemap(ax, source=ctx.providers.OpenStreetMap.Mapnik)
-# Adjust view
-ax.set_xlim(minx - x_margin, maxx + x_margin)
-ax.set_ylim(miny - y_margin, maxy + y_margin)
-ax.set_axis_off()
-# Optionally add a legend for clarity (showing dashed red line meaning)
-ax.legend(loc='lower right')
-# Save the static map to a PNG file
-plt.savefig("rfk_extended_grid.png", dpi=300)
-plt.close(fig)
+def build_static_map(ext_gdf):
+    """Renders the static PNG. matplotlib/contextily are imported here so that
+    importing or byte-compiling this module doesn't pay their startup cost."""
+    import contextily as ctx
+    import matplotlib.pyplot as plt
+
+    # Project geometries to Web Mercator (EPSG:3857) for plotting with OSM tiles
+    ext_gdf_merc = ext_gdf.to_crs(epsg=3857)
+    # Determine plot extents (add a small margin around the data bounds for context)
+    minx, miny, maxx, maxy = ext_gdf_merc.total_bounds
+    x_margin = (maxx - minx) * 0.1
+    y_margin = (maxy - miny) * 0.1
+    # Create plot
+    fig, ax = plt.subplots(figsize=(8, 6))
+    # Plot the extended lines in red dashed style
+    ext_gdf_merc.plot(ax=ax, color='red', linewidth=2, linestyle='--', label='Proposed Extended Streets')
+    # Add OpenStreetMap base tiles
+    ctx.add_basemap(ax, source=ctx.providers.OpenStreetMap.Mapnik)
+    # Adjust view
+    ax.set_xlim(minx - x_margin, maxx + x_margin)
+    ax.set_ylim(miny - y_margin, maxy + y_margin)
+    ax.set_axis_off()
+    # Optionally add a legend for clarity (showing dashed red line meaning)
+    ax.legend(loc='lower right')
+    # Save the static map to a PNG file
+    plt.savefig("rfk_extended_grid.png", dpi=300)
+    plt.close(fig)
 
 # 3. Prepare an interactive map with Folium
-# Use center of RFK site (approx 38.890 N, -76.972 W):contentReference[oaicite:4]{index=4} and a suitable zoom level
-map_center = [38.890, -76.972]
-m = folium.Map(location=map_center, zoom_start=14)  # OpenStreetMap base by default:contentReference[oaicite:5]{index=5}
-# Add each extended line to the folium map with a dashed red style
-for line in extended_lines:
-    # Extract line coordinates in [lat, lon] format for folium
-    coords = [(pt[1], pt[0]) for pt in line.coords]  # shapely gives (x, y) as (lon, lat)
-    folium.PolyLine(coords, color="red", weight=4, opacity=1, dash_array="5,5").add_to(m)
-# (Optional) Add a tooltip or marker legend explaining the dashed lines on the interactive map
-folium.LayerControl().add_to(m)  # add layer control if multiple layers (not strictly needed here)
-
-# Save interactive map to an HTML file
-m.save("rfk_extended_grid_map.html")
-
-print("Static map saved as rfk_extended_grid.png")
-print("Interactive map saved as rfk_extended_grid_map.html")
+def build_interactive_map(extended_lines):
+    """Renders the interactive Leaflet map to rfk_extended_grid_map.html."""
+    # Use center of RFK site (approx 38.890 N, -76.972 W):contentReference[oaicite:4]{index=4} and a suitable zoom level
+    map_center = [38.890, -76.972]
+    m = folium.Map(location=map_center, zoom_start=14)  # OpenStreetMap base by default:contentReference[oaicite:5]{index=5}
+    # Add each extended line to the folium map with a dashed red style
+    for line in extended_lines:
+        # Extract line coordinates in [lat, lon] format for folium
+        coords = [(pt[1], pt[0]) for pt in line.coords]  # shapely gives (x, y) as (lon, lat)
+        folium.PolyLine(coords, color="red", weight=4, opacity=1, dash_array="5,5").add_to(m)
+    # (Optional) Add a tooltip or marker legend explaining the dashed lines on the interactive map
+    folium.LayerControl().add_to(m)  # add layer control if multiple layers (not strictly needed here)
+
+    # Save interactive map to an HTML file
+    m.save("rfk_extended_grid_map.html")
+
+# Only render (and pull in matplotlib/contextily, fetch OSM tiles, write the
+# output files) when run as a script, not when imported by other tooling
+if __name__ == "__main__":
+    build_static_map(ext_gdf)
+    build_interactive_map(extended_lines)
+    print("Static map saved as rfk_extended_grid.png")
+    print("Interactive map saved as rfk_extended_grid_map.html")